@@ -8,13 +8,24 @@ import os
 import subprocess
 import sys
 import shutil
+import concurrent.futures
 from pathlib import Path
 
-def run_command(cmd, description):
-    """Run a command with error handling"""
+# Stdlib packages none of the bundled scripts import; excluding them keeps
+# PyInstaller's analysis shorter and the executables smaller
+UNUSED_MODULES = ['test', 'unittest', 'lib2to3', 'pydoc_data']
+# The CLI tools additionally never touch the GUI toolkit
+CLI_UNUSED_MODULES = UNUSED_MODULES + ['tkinter']
+
+def exclude_flags(modules):
+    """Build PyInstaller --exclude-module arguments for a list of modules"""
+    return [f'--exclude-module={module}' for module in modules]
+
+def run_command(cmd, description, env=None):
+    """Run a command (argv list, no shell) with error handling"""
     print(f"⏳ {description}...")
     try:
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        result = subprocess.run(cmd, capture_output=True, text=True, env=env)
         if result.returncode == 0:
             print(f"✅ {description} completed successfully")
             return True
@@ -25,6 +36,49 @@ def run_command(cmd, description):
         print(f"❌ {description} error: {e}")
         return False
 
+def run_pyinstaller(args, description):
+    """Run PyInstaller in this interpreter, skipping a `python -m PyInstaller` start-up"""
+    # PyInstaller's run() is not reentrant: concurrent builds must use run_command
+    print(f"⏳ {description}...")
+    try:
+        from PyInstaller import __main__ as pyinstaller_main
+        pyinstaller_main.run(args)
+        print(f"✅ {description} completed successfully")
+        return True
+    except SystemExit as e:
+        # PyInstaller reports fatal errors by exiting
+        if e.code in (None, 0):
+            print(f"✅ {description} completed successfully")
+            return True
+        print(f"❌ {description} failed: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ {description} error: {e}")
+        return False
+
+def copy_file(src, dst):
+    """Copy a file, using the native Windows CopyFile API when pywin32 is available"""
+    try:
+        import win32file
+        win32file.CopyFile(src, dst, False)
+        return dst
+    except ImportError:
+        return shutil.copy2(src, dst)
+
+def copy_path(src, dst):
+    """Copy a file or a whole directory tree (e.g. a PyInstaller onedir bundle)"""
+    if os.path.isdir(src):
+        return shutil.copytree(src, dst, copy_function=copy_file, dirs_exist_ok=True)
+    return copy_file(src, dst)
+
+def list_dir(path):
+    """Return the set of entry names in a directory (empty if it doesn't exist)"""
+    try:
+        with os.scandir(path) as entries:
+            return {entry.name for entry in entries}
+    except FileNotFoundError:
+        return set()
+
 def clean_build_dirs():
     """Clean up build directories"""
     dirs_to_clean = ['build', 'dist', '__pycache__']
@@ -40,19 +94,19 @@ def build_gui_executable():
     print("="*60)
     
     # Build GUI executable
-    cmd = (
-        'python -m PyInstaller '
-        '--name="Mermaid Chart Generator" '
-        '--windowed '
-        '--icon=NONE '
-        '--add-data="LICENSE;." '
-        '--add-data="README.md;." '
-        '--add-data="user_guideline.md;." '
-        '--add-data="requirements.txt;." '
+    args = [
+        '--name=Mermaid Chart Generator',
+        '--windowed',
+        '--icon=NONE',
+        '--add-data=LICENSE;.',
+        '--add-data=README.md;.',
+        '--add-data=user_guideline.md;.',
+        '--add-data=requirements.txt;.',
+        *exclude_flags(UNUSED_MODULES),
         'gui_tool.py'
-    )
+    ]
     
-    return run_command(cmd, "Building GUI executable")
+    return run_pyinstaller(args, "Building GUI executable")
 
 def build_cli_executables():
     """Build CLI executables"""
@@ -61,38 +115,55 @@ def build_cli_executables():
     print("="*60)
     
     # Build export_document.py executable
-    cmd1 = (
-        'python -m PyInstaller '
-        '--name="mermaid-export" '
-        '--console '
-        '--add-data="LICENSE;." '
+    cmd1 = [
+        sys.executable, '-m', 'PyInstaller',
+        '--name=mermaid-export',
+        '--console',
+        '--add-data=LICENSE;.',
+        *exclude_flags(CLI_UNUSED_MODULES),
         'export_document.py'
-    )
+    ]
     
     # Build export_flowcharts_only.py executable
-    cmd2 = (
-        'python -m PyInstaller '
-        '--name="mermaid-charts" '
-        '--console '
-        '--add-data="LICENSE;." '
+    cmd2 = [
+        sys.executable, '-m', 'PyInstaller',
+        '--name=mermaid-charts',
+        '--console',
+        '--add-data=LICENSE;.',
+        *exclude_flags(CLI_UNUSED_MODULES),
         'export_flowcharts_only.py'
-    )
+    ]
     
     # Build setup_env.py executable
-    cmd3 = (
-        'python -m PyInstaller '
-        '--name="mermaid-setup" '
-        '--console '
-        '--add-data="LICENSE;." '
+    cmd3 = [
+        sys.executable, '-m', 'PyInstaller',
+        '--name=mermaid-setup',
+        '--console',
+        '--add-data=LICENSE;.',
+        *exclude_flags(CLI_UNUSED_MODULES),
         'setup_env.py'
-    )
+    ]
     
-    success = True
-    success &= run_command(cmd1, "Building mermaid-export executable")
-    success &= run_command(cmd2, "Building mermaid-charts executable") 
-    success &= run_command(cmd3, "Building mermaid-setup executable")
+    builds = [
+        ("mermaid-export", cmd1, "Building mermaid-export executable"),
+        ("mermaid-charts", cmd2, "Building mermaid-charts executable"),
+        ("mermaid-setup", cmd3, "Building mermaid-setup executable"),
+    ]
+    
+    # The targets write to separate build/<name> and dist/<name> dirs, but
+    # PyInstaller also keeps a per-user cache (bincache) under its config dir;
+    # give each concurrent build its own (outside build/, so clean_build
+    # keeps the cache) so they never write the same files
+    def run_build(build):
+        name, cmd, description = build
+        config_dir = os.path.abspath(os.path.join('.pyinstaller', name))
+        env = dict(os.environ, PYINSTALLER_CONFIG_DIR=config_dir)
+        return run_command(cmd, description, env=env)
     
-    return success
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(builds)) as executor:
+        results = list(executor.map(run_build, builds))
+    
+    return all(results)
 
 def create_installer_package():
     """Create installer package with all executables"""
@@ -106,26 +177,28 @@ def create_installer_package():
         shutil.rmtree(package_dir)
     os.makedirs(package_dir)
     
-    # Copy executables
-    files_to_copy = [
-        ("dist/Mermaid Chart Generator/Mermaid Chart Generator.exe", "Mermaid Chart Generator.exe"),
-        ("dist/mermaid-export/mermaid-export.exe", "mermaid-export.exe"),
-        ("dist/mermaid-charts/mermaid-charts.exe", "mermaid-charts.exe"),
-        ("dist/mermaid-setup/mermaid-setup.exe", "mermaid-setup.exe"),
-    ]
+    # Copy executables. Each onedir bundle is its .exe plus the _internal/
+    # folder it needs at run time; the bundles are merged so every .exe sits
+    # at the top of the package and they share one _internal/
+    bundles = ["Mermaid Chart Generator", "mermaid-export", "mermaid-charts", "mermaid-setup"]
+    
+    # One directory read tells us which build outputs exist at all
+    built = list_dir('dist')
     
-    for src, dst in files_to_copy:
-        if os.path.exists(src):
-            shutil.copy2(src, os.path.join(package_dir, dst))
-            print(f"📦 Copied {dst}")
+    for name in bundles:
+        src = os.path.join('dist', name)
+        if name in built:
+            copy_path(src, package_dir)
+            print(f"📦 Copied {name}.exe (with its runtime files)")
         else:
-            print(f"⚠️  File not found: {src}")
+            print(f"⚠️  Build not found: {src}")
     
     # Copy documentation
     docs_to_copy = ["LICENSE", "README.md", "user_guideline.md"]
+    present = list_dir('.')
     for doc in docs_to_copy:
-        if os.path.exists(doc):
-            shutil.copy2(doc, os.path.join(package_dir, doc))
+        if doc in present:
+            copy_path(doc, os.path.join(package_dir, doc))
             print(f"📄 Copied {doc}")
     
     print(f"\n✅ Package created in: {package_dir}/")
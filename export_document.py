@@ -5,66 +5,88 @@ Exports Markdown files to DOCX format and converts Mermaid flowcharts to PNG ima
 """
 
 import os
-import re
 import sys
+import shutil
 import subprocess
-import platform
 import argparse
 from pathlib import Path
 
-class DocumentExporter:
+from mermaid_common import MermaidExporter, run_streaming
+
+# Installation methods per tool and platform.system().lower() (None = any other
+# platform). Each entry is (name, command, tool probed for availability, manual
+# instructions); manual-only entries have no command, always-available ones no probe.
+_NPM_MERMAID_MANUAL = "1. Install Node.js from https://nodejs.org/\n2. Run: npm install -g @mermaid-js/mermaid-cli"
+INSTALLATION_OPTIONS = {
+    'pandoc': {
+        'windows': (
+            ("Chocolatey", ("choco", "install", "pandoc", "-y"), 'choco', None),
+            ("Winget", ("winget", "install", "JohnMacFarlane.Pandoc"), 'winget', None),
+            ("Manual download", None, None, "Visit: https://pandoc.org/installing.html#windows"),
+        ),
+        'darwin': (
+            ("Homebrew", ("brew", "install", "pandoc"), 'brew', None),
+            ("Manual download", None, None, "Visit: https://pandoc.org/installing.html#macos"),
+        ),
+        'linux': (
+            ("APT (Ubuntu/Debian)", ("sudo", "apt-get", "install", "-y", "pandoc"), None, None),
+            ("DNF (Fedora/RHEL)", ("sudo", "dnf", "install", "-y", "pandoc"), None, None),
+            ("Manual download", None, None, "Visit: https://pandoc.org/installing.html#linux"),
+        ),
+    },
+    'mermaid': {
+        'windows': (
+            ("npm install (requires Node.js)", ("npm", "install", "-g", "@mermaid-js/mermaid-cli"), 'npm', None),
+            ("Chocolatey", ("choco", "install", "mermaid", "-y"), 'choco', None),
+            ("Manual installation", None, None, _NPM_MERMAID_MANUAL),
+        ),
+        None: (
+            ("npm install", ("npm", "install", "-g", "@mermaid-js/mermaid-cli"), 'npm', None),
+            ("Manual installation", None, None, _NPM_MERMAID_MANUAL),
+        ),
+    },
+}
+
+class DocumentExporter(MermaidExporter):
     def __init__(self):
-        self.platform = platform.system().lower()
-        self.is_windows = self.platform == 'windows'
-        self.is_macos = self.platform == 'darwin'
-        self.is_linux = self.platform.startswith('linux')
+        super().__init__()
         
-        # Color codes for terminal output
-        self.COLORS = {
-            'RED': '\033[91m',
-            'GREEN': '\033[92m',
-            'YELLOW': '\033[93m',
-            'BLUE': '\033[94m',
-            'MAGENTA': '\033[95m',
-            'CYAN': '\033[96m',
-            'WHITE': '\033[97m',
-            'RESET': '\033[0m',
-            'BOLD': '\033[1m'
-        }
-    
-    def color_print(self, message, color='WHITE', bold=False):
-        """Print colored output to terminal"""
-        color_code = self.COLORS.get(color.upper(), self.COLORS['WHITE'])
-        bold_code = self.COLORS['BOLD'] if bold else ''
-        print(f"{bold_code}{color_code}{message}{self.COLORS['RESET']}")
+        # Results of external tool probes, keyed by tool name
+        self._tool_cache = {}
     
     def check_tool_installed(self, tool_name):
-        """Check if a tool is installed and available in PATH"""
+        """Check if a tool is installed and available in PATH (probed once per tool)"""
+        if tool_name not in self._tool_cache:
+            self._tool_cache[tool_name] = self.probe_tool(tool_name)
+        return self._tool_cache[tool_name]
+    
+    def probe_tool(self, tool_name):
+        """Run the tool's --version command and report whether it succeeded"""
         try:
             if tool_name == 'pandoc':
                 result = subprocess.run(['pandoc', '--version'], 
-                                      capture_output=True, text=True, timeout=10)
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=10)
                 return result.returncode == 0
             elif tool_name == 'mermaid':
                 # Check if mmdc is available in PATH
                 result = subprocess.run(['mmdc', '--version'], 
-                                      capture_output=True, text=True, timeout=10)
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=10)
                 return result.returncode == 0
             elif tool_name == 'npm':
                 result = subprocess.run(['npm', '--version'], 
-                                      capture_output=True, text=True, timeout=10)
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=10)
                 return result.returncode == 0
             elif tool_name == 'choco':
                 result = subprocess.run(['choco', '--version'], 
-                                      capture_output=True, text=True, timeout=10)
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=10)
                 return result.returncode == 0
             elif tool_name == 'winget':
                 result = subprocess.run(['winget', '--version'], 
-                                      capture_output=True, text=True, timeout=10)
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=10)
                 return result.returncode == 0
             elif tool_name == 'brew':
                 result = subprocess.run(['brew', '--version'], 
-                                      capture_output=True, text=True, timeout=10)
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=10)
                 return result.returncode == 0
         except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
             return False
@@ -72,40 +94,16 @@ class DocumentExporter:
     
     def get_installation_options(self, tool_name):
         """Get platform-specific installation options with executable commands"""
-        options = []
-        
-        if tool_name == 'pandoc':
-            if self.is_windows:
-                options.extend([
-                    {"name": "Chocolatey", "command": "choco install pandoc -y", "available": self.check_tool_installed('choco')},
-                    {"name": "Winget", "command": "winget install JohnMacFarlane.Pandoc", "available": self.check_tool_installed('winget')},
-                    {"name": "Manual download", "command": None, "instructions": "Visit: https://pandoc.org/installing.html#windows"}
-                ])
-            elif self.is_macos:
-                options.extend([
-                    {"name": "Homebrew", "command": "brew install pandoc", "available": self.check_tool_installed('brew')},
-                    {"name": "Manual download", "command": None, "instructions": "Visit: https://pandoc.org/installing.html#macos"}
-                ])
-            elif self.is_linux:
-                options.extend([
-                    {"name": "APT (Ubuntu/Debian)", "command": "sudo apt-get install -y pandoc", "available": True},
-                    {"name": "DNF (Fedora/RHEL)", "command": "sudo dnf install -y pandoc", "available": True},
-                    {"name": "Manual download", "command": None, "instructions": "Visit: https://pandoc.org/installing.html#linux"}
-                ])
+        platform_options = INSTALLATION_OPTIONS.get(tool_name, {})
+        entries = platform_options.get(self.platform, platform_options.get(None, ()))
         
-        elif tool_name == 'mermaid':
-            if self.is_windows:
-                options.extend([
-                    {"name": "npm install (requires Node.js)", "command": "npm install -g @mermaid-js/mermaid-cli", "available": self.check_tool_installed('npm')},
-                    {"name": "Chocolatey", "command": "choco install mermaid -y", "available": self.check_tool_installed('choco')},
-                    {"name": "Manual installation", "command": None, "instructions": "1. Install Node.js from https://nodejs.org/\n2. Run: npm install -g @mermaid-js/mermaid-cli"}
-                ])
+        options = []
+        for name, command, probe, instructions in entries:
+            if command is None:
+                options.append({"name": name, "command": None, "instructions": instructions})
             else:
-                options.extend([
-                    {"name": "npm install", "command": "npm install -g @mermaid-js/mermaid-cli", "available": self.check_tool_installed('npm')},
-                    {"name": "Manual installation", "command": None, "instructions": "1. Install Node.js from https://nodejs.org/\n2. Run: npm install -g @mermaid-js/mermaid-cli"}
-                ])
-        
+                # Package managers are probed lazily, only once the user picks them
+                options.append({"name": name, "command": list(command), "probe": probe})
         return options
     
     def prompt_yes_no(self, question):
@@ -122,7 +120,13 @@ class DocumentExporter:
         """Prompt user to select from numbered options"""
         print(f"\n{question}")
         for i, option in enumerate(options, 1):
-            status = "✓" if option.get('available', True) else "✗ (not available)"
+            probe = option.get('probe')
+            if probe and probe not in self._tool_cache:
+                status = ""  # Not probed yet
+            elif not probe or self._tool_cache[probe]:
+                status = "✓"
+            else:
+                status = "✗ (not available)"
             print(f"{i}. {option['name']} {status}")
         
         while True:
@@ -137,67 +141,74 @@ class DocumentExporter:
             except ValueError:
                 print("Please enter a valid number")
     
+    def run_streaming(self, command, timeout):
+        """Run a command, echoing its combined output line by line as it arrives
+        
+        Returns the exit code; raises subprocess.TimeoutExpired if the command
+        is still running after `timeout` seconds (it is killed in that case).
+        """
+        return run_streaming(command, timeout, lambda line: print(line, end=''))
+    
     def install_tool_interactive(self, tool_name):
         """Interactive tool installation with multiple options"""
         self.color_print(f"\n{tool_name.upper()} is not installed.", 'YELLOW', True)
         
+        # Build the option list once; retries below reuse it instead of re-probing
         options = self.get_installation_options(tool_name)
         
         # Add skip option
         options.append({"name": "Skip installation", "command": None, "instructions": None})
         
-        selected_index = self.prompt_option_selection(
-            f"Choose installation method for {tool_name}:", options
-        )
-        
-        selected_option = options[selected_index]
-        
-        if selected_option['name'] == "Skip installation":
-            self.color_print(f"Skipping {tool_name} installation.", 'YELLOW')
-            return True  # Continue without the tool
-        
-        if selected_option['command']:
-            # Try to execute the command
-            self.color_print(f"Attempting to install using: {selected_option['command']}", 'BLUE')
-            try:
-                result = subprocess.run(
-                    selected_option['command'], 
-                    shell=True, 
-                    capture_output=True, 
-                    text=True, 
-                    timeout=120
-                )
-                
-                if result.returncode == 0:
-                    self.color_print(f"✓ Successfully installed {tool_name}", 'GREEN')
-                    return True  # Installation successful
-                else:
-                    self.color_print(f"✗ Installation failed: {result.stderr}", 'RED')
-                    self.color_print("Please try another installation method.", 'YELLOW')
-                    return self.install_tool_interactive(tool_name)  # Retry
-                    
-            except subprocess.TimeoutExpired:
-                self.color_print("✗ Installation timed out", 'RED')
-                return False
-            except Exception as e:
-                self.color_print(f"✗ Installation error: {e}", 'RED')
-                return False
-        else:
-            # Show manual instructions
-            self.color_print("Manual installation instructions:", 'CYAN')
-            self.color_print(selected_option['instructions'], 'WHITE')
+        while True:
+            selected_index = self.prompt_option_selection(
+                f"Choose installation method for {tool_name}:", options
+            )
+            
+            selected_option = options[selected_index]
             
-            if self.prompt_yes_no("Would you like to try another installation method?"):
-                return self.install_tool_interactive(tool_name)  # Retry
+            if selected_option['name'] == "Skip installation":
+                self.color_print(f"Skipping {tool_name} installation.", 'YELLOW')
+                return True  # Continue without the tool
+            
+            probe = selected_option.get('probe')
+            if probe and not self.check_tool_installed(probe):
+                self.color_print(f"✗ {probe} is not available. Please choose another installation method.", 'RED')
+                continue
+            
+            if selected_option['command']:
+                # Try to execute the command directly, without an intermediate shell
+                command = selected_option['command']
+                self.color_print(f"Attempting to install using: {' '.join(command)}", 'BLUE')
+                try:
+                    # Resolve the executable via PATH/PATHEXT so npm.cmd & co. work on Windows
+                    executable = shutil.which(command[0]) or command[0]
+                    return_code = self.run_streaming([executable] + command[1:], timeout=120)
+                    
+                    if return_code == 0:
+                        self.color_print(f"✓ Successfully installed {tool_name}", 'GREEN')
+                        # Forget the cached "not installed" result so run() re-probes
+                        self._tool_cache.pop(tool_name, None)
+                        return True  # Installation successful
+                    
+                    self.color_print(f"✗ Installation failed (exit code {return_code})", 'RED')
+                    self.color_print("Please try another installation method.", 'YELLOW')
+                    # Retry
+                        
+                except subprocess.TimeoutExpired:
+                    self.color_print("✗ Installation timed out", 'RED')
+                    return False
+                except Exception as e:
+                    self.color_print(f"✗ Installation error: {e}", 'RED')
+                    return False
             else:
-                self.color_print(f"Please install {tool_name} manually and run this script again.", 'YELLOW')
-                return False
-    
-    def extract_mermaid_blocks(self, markdown_content):
-        """Extract all Mermaid code blocks from Markdown content"""
-        pattern = r'```mermaid\s*(.*?)```'
-        matches = re.findall(pattern, markdown_content, re.DOTALL)
-        return matches
+                # Show manual instructions
+                self.color_print("Manual installation instructions:", 'CYAN')
+                self.color_print(selected_option['instructions'], 'WHITE')
+                
+                if not self.prompt_yes_no("Would you like to try another installation method?"):
+                    self.color_print(f"Please install {tool_name} manually and run this script again.", 'YELLOW')
+                    return False
+                # Retry
     
     def export_to_docx(self, input_file, output_file=None):
         """Convert Markdown file to DOCX using pandoc"""
@@ -226,62 +237,9 @@ class DocumentExporter:
     
     def export_flowcharts_to_images(self, input_file, output_dir='flowchats'):
         """Export Mermaid flowcharts to PNG images"""
-        # Create output directory if it doesn't exist
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Read the Markdown file
-        try:
-            with open(input_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except Exception as e:
-            self.color_print(f"✗ Error reading file: {e}", 'RED')
-            return False
-        
-        # Extract Mermaid blocks
-        mermaid_blocks = self.extract_mermaid_blocks(content)
-        
-        if not mermaid_blocks:
-            self.color_print("No Mermaid flowcharts found in the document.", 'YELLOW')
-            return True
-        
-        self.color_print(f"Found {len(mermaid_blocks)} Mermaid flowchart(s)", 'BLUE')
-        
-        success_count = 0
-        for i, mermaid_code in enumerate(mermaid_blocks, 1):
-            output_file = os.path.join(output_dir, f'flowchart_{i}.png')
-            
-            # Create temporary .mmd file
-            temp_file = f'temp_flowchart_{i}.mmd'
-            try:
-                with open(temp_file, 'w', encoding='utf-8') as f:
-                    f.write(mermaid_code.strip())
-                
-                # Convert to PNG using mmdc
-                self.color_print(f"Converting flowchart {i} to PNG...", 'BLUE')
-                result = subprocess.run([
-                    'mmdc', '-i', temp_file, '-o', output_file,
-                    '-w', '1200', '-H', '800', '--backgroundColor', 'white'
-                ], capture_output=True, text=True, timeout=30)
-                
-                if result.returncode == 0:
-                    self.color_print(f"✓ Created: {output_file}", 'GREEN')
-                    success_count += 1
-                else:
-                    self.color_print(f"✗ Failed to convert flowchart {i}: {result.stderr}", 'RED')
-                
-                # Clean up temporary file
-                os.remove(temp_file)
-                
-            except Exception as e:
-                self.color_print(f"✗ Error processing flowchart {i}: {e}", 'RED')
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
-        
-        self.color_print(f"Successfully converted {success_count}/{len(mermaid_blocks)} flowcharts", 
-                         'GREEN' if success_count == len(mermaid_blocks) else 'YELLOW')
-        return success_count > 0
+        return self.export_flowcharts(input_file, output_dir)
     
-    def run(self, input_file):
+    def run(self, input_file, output_dir='flowchats'):
         """Main execution method"""
         self.color_print("=" * 60, 'CYAN', True)
         self.color_print("DOCUMENT EXPORT SCRIPT", 'CYAN', True)
@@ -323,7 +281,7 @@ class DocumentExporter:
             self.color_print("Skipping DOCX conversion (pandoc not available)", 'YELLOW')
         
         if mermaid_installed:
-            success &= self.export_flowcharts_to_images(input_file)
+            success &= self.export_flowcharts_to_images(input_file, output_dir)
         else:
             self.color_print("Skipping flowchart export (mermaid-cli not available)", 'YELLOW')
         
@@ -344,7 +302,7 @@ def main():
     args = parser.parse_args()
     
     exporter = DocumentExporter()
-    success = exporter.run(args.input_file)
+    success = exporter.run(args.input_file, args.output_dir)
     
     sys.exit(0 if success else 1)
 
@@ -6,107 +6,31 @@ Use this when Mermaid CLI installation fails for the full document export.
 """
 
 import os
-import re
 import sys
 import subprocess
-import platform
 import argparse
 from pathlib import Path
 
-class FlowchartExporter:
+from mermaid_common import MermaidExporter
+
+class FlowchartExporter(MermaidExporter):
     def __init__(self):
-        self.platform = platform.system().lower()
+        super().__init__()
         
-        # Color codes for terminal output
-        self.COLORS = {
-            'RED': '\033[91m',
-            'GREEN': '\033[92m',
-            'YELLOW': '\033[93m',
-            'BLUE': '\033[94m',
-            'CYAN': '\033[96m',
-            'WHITE': '\033[97m',
-            'RESET': '\033[0m',
-            'BOLD': '\033[1m'
-        }
-    
-    def color_print(self, message, color='WHITE', bold=False):
-        """Print colored output to terminal"""
-        color_code = self.COLORS.get(color.upper(), self.COLORS['WHITE'])
-        bold_code = self.COLORS['BOLD'] if bold else ''
-        print(f"{bold_code}{color_code}{message}{self.COLORS['RESET']}")
+        # Result of the mmdc probe, None until first checked
+        self._mermaid_installed = None
     
     def check_mermaid_installed(self):
-        """Check if Mermaid CLI is installed"""
-        try:
-            # Check if mmdc is available in PATH
-            result = subprocess.run(['mmdc', '--version'], 
-                                  capture_output=True, text=True, timeout=10)
-            return result.returncode == 0
-        except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
-            return False
-    
-    def extract_mermaid_blocks(self, markdown_content):
-        """Extract all Mermaid code blocks from Markdown content"""
-        pattern = r'```mermaid\s*(.*?)```'
-        matches = re.findall(pattern, markdown_content, re.DOTALL)
-        return matches
-    
-    def export_flowcharts(self, input_file, output_dir='flowchats'):
-        """Export Mermaid flowcharts to PNG images"""
-        # Create output directory if it doesn't exist
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Read the Markdown file
-        try:
-            with open(input_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except Exception as e:
-            self.color_print(f"✗ Error reading file: {e}", 'RED')
-            return False
-        
-        # Extract Mermaid blocks
-        mermaid_blocks = self.extract_mermaid_blocks(content)
-        
-        if not mermaid_blocks:
-            self.color_print("No Mermaid flowcharts found in the document.", 'YELLOW')
-            return True
-        
-        self.color_print(f"Found {len(mermaid_blocks)} Mermaid flowchart(s)", 'BLUE')
-        
-        success_count = 0
-        for i, mermaid_code in enumerate(mermaid_blocks, 1):
-            output_file = os.path.join(output_dir, f'flowchart_{i}.png')
-            
-            # Create temporary .mmd file
-            temp_file = f'temp_flowchart_{i}.mmd'
+        """Check if Mermaid CLI is installed (probed once per run)"""
+        if self._mermaid_installed is None:
             try:
-                with open(temp_file, 'w', encoding='utf-8') as f:
-                    f.write(mermaid_code.strip())
-                
-                # Convert to PNG using mmdc
-                self.color_print(f"Converting flowchart {i} to PNG...", 'BLUE')
-                result = subprocess.run([
-                    'mmdc', '-i', temp_file, '-o', output_file,
-                    '-w', '1200', '-H', '800', '--backgroundColor', 'white'
-                ], capture_output=True, text=True, timeout=30)
-                
-                if result.returncode == 0:
-                    self.color_print(f"✓ Created: {output_file}", 'GREEN')
-                    success_count += 1
-                else:
-                    self.color_print(f"✗ Failed to convert flowchart {i}: {result.stderr}", 'RED')
-                
-                # Clean up temporary file
-                os.remove(temp_file)
-                
-            except Exception as e:
-                self.color_print(f"✗ Error processing flowchart {i}: {e}", 'RED')
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
-        
-        self.color_print(f"Successfully converted {success_count}/{len(mermaid_blocks)} flowcharts", 
-                         'GREEN' if success_count == len(mermaid_blocks) else 'YELLOW')
-        return success_count > 0
+                # Check if mmdc is available in PATH
+                result = subprocess.run(['mmdc', '--version'], 
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=10)
+                self._mermaid_installed = result.returncode == 0
+            except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
+                self._mermaid_installed = False
+        return self._mermaid_installed
     
     def provide_manual_instructions(self, input_file):
         """Provide instructions for manual conversion"""
@@ -116,8 +40,7 @@ class FlowchartExporter:
         
         # Read the Markdown file to extract Mermaid blocks
         try:
-            with open(input_file, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = self.read_markdown(input_file)
             
             mermaid_blocks = self.extract_mermaid_blocks(content)
             
@@ -165,7 +88,7 @@ class FlowchartExporter:
 """
         print(guide)
     
-    def run(self, input_file):
+    def run(self, input_file, output_dir='flowchats'):
         """Main execution method"""
         self.color_print("=" * 60, 'CYAN', True)
         self.color_print("FLOWCHART EXPORT TOOL", 'CYAN', True)
@@ -182,7 +105,7 @@ class FlowchartExporter:
         
         if mermaid_installed:
             self.color_print("✓ Mermaid CLI is installed", 'GREEN')
-            success = self.export_flowcharts(input_file)
+            success = self.export_flowcharts(input_file, output_dir)
             
             if success:
                 self.color_print("\n✓ Flowchart export completed!", 'GREEN', True)
@@ -210,7 +133,7 @@ def main():
     args = parser.parse_args()
     
     exporter = FlowchartExporter()
-    success = exporter.run(args.input_file)
+    success = exporter.run(args.input_file, args.output_dir)
     
     sys.exit(0 if success else 1)
 
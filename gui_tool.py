@@ -6,12 +6,27 @@ Graphical user interface for converting Markdown files with Mermaid diagrams.
 
 import os
 import sys
-import subprocess
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import threading
+import asyncio
+import collections
+import codecs
+import queue
 from pathlib import Path
 
+# Maximum number of lines kept in the log area; older lines are dropped
+LOG_MAX_LINES = 2000
+# Size of each raw read from a command's output pipe
+OUTPUT_CHUNK_SIZE = 64 * 1024
+# How often (ms, ~30 fps) queued output and status/progress changes are
+# applied to the widgets, and at most how many queued chunks are handled per
+# pass so the GUI stays responsive
+LOG_POLL_MS = 33
+LOG_MAX_CHUNKS = 64
+# Characters of trailing output shown in the error dialog when a command fails
+ERROR_TAIL_CHARS = 2000
+
 class MermaidGUI:
     def __init__(self, root):
         self.root = root
@@ -25,12 +40,30 @@ class MermaidGUI:
         self.progress = tk.DoubleVar()
         self.status = tk.StringVar(value="Ready")
         
+        # Output queued by running commands, always whole lines so output of
+        # concurrent commands never interleaves mid-line, and complete lines
+        # waiting to be written to the log area
+        self._output_queue = queue.Queue()
+        self._pending_log = collections.deque(maxlen=LOG_MAX_LINES)
+        # Latest status/progress set by worker threads, applied on the next
+        # poll (None means unchanged); the lock makes taking a value and
+        # resetting it atomic, so an update set in between is never lost
+        self._pending_lock = threading.Lock()
+        self._pending_status = None
+        self._pending_progress = None
+        
         # Configure styles
         self.setup_styles()
         
         # Create interface
         self.create_widgets()
         
+        # Event loop that runs the conversion commands
+        self.start_event_loop()
+        
+        # Start moving queued output into the log area
+        self.root.after(LOG_POLL_MS, self.drain_output)
+        
     def setup_styles(self):
         """Configure ttk styles"""
         style = ttk.Style()
@@ -152,72 +185,158 @@ class MermaidGUI:
         self.output_dir.set(os.getcwd())
         self.progress.set(0)
         self.status.set("Ready")
+        with self._pending_lock:
+            self._pending_status = None
+            self._pending_progress = None
+        self._pending_log.clear()
         self.log_text.delete(1.0, tk.END)
         
     def log_message(self, message):
-        """Add message to log area"""
-        self.log_text.insert(tk.END, message + "\n")
+        """Add message to log area (queued; written out by drain_output)"""
+        self._output_queue.put(message + "\n")
+        
+    def drain_output(self):
+        """Apply pending status/progress and move queued output into the log
+        area, then reschedule itself"""
+        # Only the latest value since the last poll is drawn
+        with self._pending_lock:
+            status, self._pending_status = self._pending_status, None
+            progress, self._pending_progress = self._pending_progress, None
+        if status is not None:
+            self.status.set(status)
+        if progress is not None:
+            self.progress.set(progress)
+        
+        chunks = []
+        for _ in range(LOG_MAX_CHUNKS):
+            try:
+                chunks.append(self._output_queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        # Every chunk ends with a newline, so the last piece is always empty
+        lines = "".join(chunks).split("\n")[:-1]
+        if lines:
+            self._pending_log.extend(line.rstrip() for line in lines)
+            self.flush_log()
+        
+        self.root.after(LOG_POLL_MS, self.drain_output)
+        
+    def flush_log(self):
+        """Write pending log messages, keeping only the last LOG_MAX_LINES lines"""
+        lines = []
+        while self._pending_log:
+            lines.append(self._pending_log.popleft())
+        if not lines:
+            return
+        
+        self.log_text.insert(tk.END, "\n".join(lines) + "\n")
+        
+        # 'end-1c' sits on the empty line after the last message
+        line_count = int(self.log_text.index('end-1c').split('.')[0])
+        if line_count > LOG_MAX_LINES + 1:
+            self.log_text.delete('1.0', f'{line_count - LOG_MAX_LINES}.0')
         self.log_text.see(tk.END)
-        self.root.update_idletasks()
         
     def update_status(self, message):
-        """Update status message"""
-        self.status.set(message)
+        """Update status message (shown on the next poll)"""
+        with self._pending_lock:
+            self._pending_status = message
         self.log_message(message)
-        self.root.update_idletasks()
         
     def update_progress(self, value):
-        """Update progress bar"""
-        self.progress.set(value)
-        self.root.update_idletasks()
+        """Update progress bar (shown on the next poll)"""
+        with self._pending_lock:
+            self._pending_progress = value
+        
+    def start_event_loop(self):
+        """Start the asyncio loop that runs commands, in a daemon thread"""
+        # Needs Python 3.8+: subprocesses from a loop outside the main thread
+        # rely on the threaded child watcher (POSIX) and the proactor loop
+        # being the default (Windows)
+        self.loop = asyncio.new_event_loop()
+        self._command_slots = None
+        thread = threading.Thread(target=self.loop.run_forever)
+        thread.daemon = True
+        thread.start()
         
     def run_command_thread(self, command, description):
-        """Run command in separate thread"""
-        def thread_function():
+        """Run command on the background event loop"""
+        asyncio.run_coroutine_threadsafe(self._run(command, description), self.loop)
+        
+    async def _show_dialog(self, show, title, message):
+        """Show a message box without stalling other running commands"""
+        await self.loop.run_in_executor(None, show, title, message)
+        
+    async def _run(self, command, description):
+        """Run one command, streaming its output into the log"""
+        # Created on the loop itself; bounds how many commands run at once
+        if self._command_slots is None:
+            self._command_slots = asyncio.Semaphore(os.cpu_count() or 1)
+        async with self._command_slots:
             try:
                 self.update_status(f"Starting {description}...")
                 self.update_progress(10)
                 
-                # Run the command
-                process = subprocess.Popen(
-                    command,
-                    shell=True,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True
+                # Run the command (argv list, no shell); force UTF-8 output so
+                # the ✓/✗ markers printed by the scripts survive the pipe on Windows.
+                # stderr shares the stdout pipe so a chatty child can never block
+                # on an undrained stderr buffer
+                process = await asyncio.create_subprocess_exec(
+                    *command,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.STDOUT,
+                    env=dict(os.environ, PYTHONIOENCODING='utf-8')
                 )
                 
-                # Read output in real-time
+                # Read output in large raw chunks and queue only the complete
+                # lines; this command's unterminated line waits for the next chunk
+                decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+                output_tail = ''
+                partial_line = ''
                 while True:
-                    output = process.stdout.readline()
-                    if output == '' and process.poll() is not None:
+                    chunk = await process.stdout.read(OUTPUT_CHUNK_SIZE)
+                    if not chunk:
                         break
-                    if output:
-                        self.log_message(output.strip())
+                    text = decoder.decode(chunk)
+                    output_tail = (output_tail + text)[-ERROR_TAIL_CHARS:]
+                    text = partial_line + text
+                    end = text.rfind('\n') + 1
+                    partial_line = text[end:]
+                    if end:
+                        self._output_queue.put(text[:end])
+                text = decoder.decode(b'', final=True)
+                output_tail = (output_tail + text)[-ERROR_TAIL_CHARS:]
+                if partial_line + text:
+                    self._output_queue.put(partial_line + text + '\n')
                 
                 # Check return code
-                return_code = process.wait()
+                return_code = await process.wait()
                 if return_code == 0:
                     self.update_status(f"✓ {description} completed successfully")
                     self.update_progress(100)
-                    messagebox.showinfo("Success", f"{description} completed successfully!")
+                    await self._show_dialog(messagebox.showinfo, "Success",
+                                            f"{description} completed successfully!")
                 else:
-                    error_output = process.stderr.read()
-                    self.log_message(f"Error: {error_output}")
+                    # The full output is already in the log; the dialog shows its tail
+                    self.log_message(f"Error: {description} exited with code {return_code}")
                     self.update_status(f"✗ {description} failed")
-                    messagebox.showerror("Error", f"{description} failed:\n{error_output}")
+                    await self._show_dialog(messagebox.showerror, "Error",
+                                            f"{description} failed:\n{output_tail.strip()}")
                     
             except Exception as e:
                 self.update_status(f"✗ Error during {description}")
                 self.log_message(f"Exception: {str(e)}")
-                messagebox.showerror("Error", f"Exception during {description}:\n{str(e)}")
+                await self._show_dialog(messagebox.showerror, "Error",
+                                        f"Exception during {description}:\n{str(e)}")
             finally:
                 self.update_progress(0)
                 
-        # Start the thread
-        thread = threading.Thread(target=thread_function)
-        thread.daemon = True
-        thread.start()
+    def python_command(self, script, *args):
+        """Build the argv list for running one of the tool's Python scripts"""
+        # A frozen (PyInstaller) GUI's sys.executable is the GUI itself
+        python = 'python' if getattr(sys, 'frozen', False) else sys.executable
+        return [python, script, *args]
         
     def generate_docx(self):
         """Generate DOCX document with embedded charts"""
@@ -228,7 +347,7 @@ class MermaidGUI:
         output_dir = self.output_dir.get()
         
         # Build command
-        cmd = f'python export_document.py "{input_file}" --output-dir "{output_dir}"'
+        cmd = self.python_command('export_document.py', input_file, '--output-dir', output_dir)
         self.run_command_thread(cmd, "DOCX generation")
         
     def export_charts_only(self):
@@ -240,7 +359,7 @@ class MermaidGUI:
         output_dir = self.output_dir.get()
         
         # Build command
-        cmd = f'python export_flowcharts_only.py "{input_file}" --output-dir "{output_dir}"'
+        cmd = self.python_command('export_flowcharts_only.py', input_file, '--output-dir', output_dir)
         self.run_command_thread(cmd, "Chart export")
         
     def validate_inputs(self):
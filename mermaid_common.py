@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Shared Mermaid Export Code
+Markdown reading, Mermaid block extraction, PNG rendering and colored output
+used by both export_document.py and export_flowcharts_only.py.
+"""
+
+import os
+import sys
+import subprocess
+import platform
+import shutil
+import tempfile
+import threading
+import concurrent.futures
+
+# Markers delimiting fenced Mermaid code blocks
+MERMAID_FENCE = '```mermaid'
+CODE_FENCE = '```'
+
+# Chunk size for reading Markdown input (matches shutil's 256 KiB copy buffer)
+READ_BUFFER_SIZE = 256 * 1024
+
+def run_streaming(command, timeout, on_line, **popen_options):
+    """Run a command, passing each line of its combined output to `on_line`
+    as it arrives
+    
+    Returns the exit code; raises subprocess.TimeoutExpired if the command
+    is still running after `timeout` seconds (it is killed in that case).
+    """
+    process = subprocess.Popen(command, stdout=subprocess.PIPE,
+                               stderr=subprocess.STDOUT, text=True,
+                               errors='replace', **popen_options)
+    timed_out = threading.Event()
+    
+    def kill():
+        timed_out.set()
+        process.kill()
+    
+    # The output loop blocks until EOF, so enforce the deadline from a timer
+    deadline = threading.Timer(timeout, kill)
+    deadline.start()
+    try:
+        for line in process.stdout:
+            on_line(line)
+        return_code = process.wait()
+    finally:
+        deadline.cancel()
+        process.stdout.close()
+    
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(command, timeout)
+    return return_code
+
+class MermaidExporter:
+    """Base class for the export scripts: terminal output plus flowchart rendering"""
+    
+    def __init__(self):
+        self.platform = platform.system().lower()
+        
+        # Color codes for terminal output
+        self.COLORS = {
+            'RED': '\033[91m',
+            'GREEN': '\033[92m',
+            'YELLOW': '\033[93m',
+            'BLUE': '\033[94m',
+            'MAGENTA': '\033[95m',
+            'CYAN': '\033[96m',
+            'WHITE': '\033[97m',
+            'RESET': '\033[0m',
+            'BOLD': '\033[1m'
+        }
+        # Only emit escape codes when writing to a terminal (not to logs/pipes)
+        self._use_color = sys.stdout.isatty()
+    
+    def color_print(self, message, color='WHITE', bold=False):
+        """Print colored output to terminal"""
+        if not self._use_color:
+            print(message)
+            return
+        color_code = self.COLORS.get(color.upper(), self.COLORS['WHITE'])
+        bold_code = self.COLORS['BOLD'] if bold else ''
+        print(f"{bold_code}{color_code}{message}{self.COLORS['RESET']}")
+    
+    def read_markdown(self, input_file):
+        """Read a Markdown file in large binary chunks and decode it once"""
+        buffer = bytearray()
+        with open(input_file, 'rb') as f:
+            chunk = f.read(READ_BUFFER_SIZE)
+            while chunk:
+                buffer += chunk
+                chunk = f.read(READ_BUFFER_SIZE)
+        # Universal newlines, as a text-mode read would give: CRLF files must
+        # not leave '\r' in the diagrams (text-mode writes would double it)
+        return buffer.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+    
+    def extract_mermaid_blocks(self, markdown_content):
+        """Extract all Mermaid code blocks from Markdown content"""
+        # Plain str.find scan: linear in the document size, even for unclosed fences
+        blocks = []
+        start = markdown_content.find(MERMAID_FENCE)
+        while start != -1:
+            body_start = start + len(MERMAID_FENCE)
+            end = markdown_content.find(CODE_FENCE, body_start)
+            if end == -1:
+                break
+            blocks.append(markdown_content[body_start:end].lstrip())
+            start = markdown_content.find(MERMAID_FENCE, end + len(CODE_FENCE))
+        return blocks
+    
+    def render_flowcharts_batch(self, numbered_blocks, output_dir, temp_dir):
+        """Render (number, code) Mermaid blocks to PNG with a single mmdc invocation
+        
+        mmdc renders every mermaid fence of a Markdown input inside one
+        Node.js process, writing <name>-1.png, <name>-2.png, ...
+        Returns the set of block numbers that were created.
+        """
+        rendered = set()
+        try:
+            # mmdc writes into a fresh directory of its own, so outputs left by
+            # an earlier (or timed-out) batch can never be taken for this one's
+            batch_dir = tempfile.mkdtemp(dir=temp_dir)
+            batch_file = os.path.join(batch_dir, 'flowcharts.md')
+            with open(batch_file, 'w', encoding='utf-8') as f:
+                for _, mermaid_code in numbered_blocks:
+                    f.write(f"```mermaid\n{mermaid_code.strip()}\n```\n\n")
+            
+            self.color_print(f"Converting {len(numbered_blocks)} flowchart(s) to PNG...", 'BLUE')
+            result = subprocess.run([
+                'mmdc', '-i', batch_file, '-o', os.path.join(batch_dir, 'flowchart.png'),
+                '-w', '1200', '-H', '800', '--backgroundColor', 'white'
+            ], capture_output=True, text=True, timeout=30 + 10 * len(numbered_blocks))
+            
+            if result.returncode != 0:
+                self.color_print(f"✗ Batch conversion failed: {result.stderr}", 'YELLOW')
+            
+            # Move mmdc's flowchart-N.png outputs to our flowchart_<number>.png scheme
+            for position, (number, _) in enumerate(numbered_blocks, 1):
+                batch_output = os.path.join(batch_dir, f'flowchart-{position}.png')
+                if os.path.exists(batch_output):
+                    output_file = os.path.join(output_dir, f'flowchart_{number}.png')
+                    shutil.move(batch_output, output_file)
+                    self.color_print(f"✓ Created: {output_file}", 'GREEN')
+                    rendered.add(number)
+                    
+        except subprocess.TimeoutExpired:
+            self.color_print("✗ Batch conversion timed out", 'YELLOW')
+        except Exception as e:
+            self.color_print(f"✗ Error during batch conversion: {e}", 'RED')
+        
+        return rendered
+    
+    def render_flowchart(self, index, mermaid_code, output_dir):
+        """Render a single Mermaid block to flowchart_<index>.png"""
+        output_file = os.path.join(output_dir, f'flowchart_{index}.png')
+        
+        try:
+            # Convert to PNG using mmdc, feeding the diagram source on stdin
+            self.color_print(f"Converting flowchart {index} to PNG...", 'BLUE')
+            result = subprocess.run([
+                'mmdc', '-i', '-', '-o', output_file,
+                '-w', '1200', '-H', '800', '--backgroundColor', 'white'
+            ], input=mermaid_code.strip(), capture_output=True, text=True, timeout=30)
+            
+            if result.returncode == 0:
+                self.color_print(f"✓ Created: {output_file}", 'GREEN')
+                return True
+            self.color_print(f"✗ Failed to convert flowchart {index}: {result.stderr}", 'RED')
+            return False
+            
+        except Exception as e:
+            self.color_print(f"✗ Error processing flowchart {index}: {e}", 'RED')
+            return False
+    
+    def export_flowcharts(self, input_file, output_dir='flowchats'):
+        """Export Mermaid flowcharts to PNG images"""
+        # Create output directory if it doesn't exist
+        os.makedirs(output_dir, exist_ok=True)
+        
+        # Read the Markdown file
+        try:
+            content = self.read_markdown(input_file)
+        except Exception as e:
+            self.color_print(f"✗ Error reading file: {e}", 'RED')
+            return False
+        
+        # Extract Mermaid blocks
+        mermaid_blocks = self.extract_mermaid_blocks(content)
+        
+        if not mermaid_blocks:
+            self.color_print("No Mermaid flowcharts found in the document.", 'YELLOW')
+            return True
+        
+        self.color_print(f"Found {len(mermaid_blocks)} Mermaid flowchart(s)", 'BLUE')
+        
+        # Render in as few mmdc (Node.js + Chromium) processes as possible. mmdc
+        # stops at the first diagram it can't render, so after a partial batch the
+        # first missing block is set aside and the rest are batched again; a broken
+        # diagram then doesn't cost every later chart its own process.
+        # The temporary Markdown input lives in a directory removed in one go.
+        pending = list(enumerate(mermaid_blocks, 1))
+        remaining = []
+        with tempfile.TemporaryDirectory() as temp_dir:
+            while pending:
+                rendered = self.render_flowcharts_batch(pending, output_dir, temp_dir)
+                pending = [(i, mermaid_code) for i, mermaid_code in pending if i not in rendered]
+                if not rendered:
+                    break
+                remaining.extend(pending[:1])
+                pending = pending[1:]
+        remaining.extend(pending)
+        success_count = len(mermaid_blocks) - len(remaining)
+        
+        # Retry whatever the batch runs could not produce one by one
+        if remaining:
+            self.color_print(f"Converting {len(remaining)} remaining flowchart(s) individually...", 'YELLOW')
+            # mmdc spends most of its time in Node.js, so threads are enough to overlap them
+            with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+                results = executor.map(
+                    self.render_flowchart,
+                    [i for i, _ in remaining],
+                    [mermaid_code for _, mermaid_code in remaining],
+                    [output_dir] * len(remaining)
+                )
+                success_count += sum(results)
+        
+        self.color_print(f"Successfully converted {success_count}/{len(mermaid_blocks)} flowcharts", 
+                         'GREEN' if success_count == len(mermaid_blocks) else 'YELLOW')
+        return success_count > 0
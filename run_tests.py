@@ -5,42 +5,64 @@ Runs comprehensive tests to verify the tool works correctly
 """
 
 import os
+import shutil
 import subprocess
 import sys
+import tempfile
+import threading
 import time
+import concurrent.futures
 from pathlib import Path
 
+# Independent test cases, run concurrently. Each writes its PNGs to its own
+# output directory so the cases never touch each other's files:
+# (name, description, script, input file, expected PNG count, expected DOCX, timeout)
+TEST_CASES = [
+    ('Basic PNG Export', 'Basic flowchart PNG export',
+     'export_flowcharts_only.py', 'examples/basic_flowchart.md', 3, None, 60),
+    ('Advanced PNG Export', 'Advanced diagrams PNG export',
+     'export_flowcharts_only.py', 'examples/advanced_diagrams.md', 5, None, 60),
+    ('DOCX Basic Export', 'DOCX document generation (basic)',
+     'export_document.py', 'examples/basic_flowchart.md', None, 'examples/basic_flowchart.docx', 60),
+    ('DOCX Advanced Export', 'DOCX document generation (advanced)',
+     'export_document.py', 'examples/advanced_diagrams.md', None, 'examples/advanced_diagrams.docx', 60),
+    ('Stress Test Export', 'Stress test PNG export (10 diagrams)',
+     'export_flowcharts_only.py', 'examples/stress_test.md', 10, None, 120),
+]
+
 def run_test(command, description, timeout=60):
-    """Run a test command and report results"""
-    print(f"🧪 Testing: {description}")
-    print(f"   Command: {command}")
+    """Run a test command (argv list, no shell) and report results"""
+    # Report in a single print so concurrently running tests don't interleave
+    report = [f"🧪 Testing: {description}", f"   Command: {subprocess.list2cmdline(command)}"]
     
     start_time = time.time()
     try:
-        result = subprocess.run(command, shell=True, capture_output=True, text=True, timeout=timeout)
+        result = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
         end_time = time.time()
         elapsed = end_time - start_time
         
         if result.returncode == 0:
-            print(f"✅ PASS: {description} ({elapsed:.2f}s)")
+            report.append(f"✅ PASS: {description} ({elapsed:.2f}s)")
             return True, elapsed
         else:
-            print(f"❌ FAIL: {description}")
-            print(f"   Error: {result.stderr}")
+            report.append(f"❌ FAIL: {description}")
+            report.append(f"   Error: {result.stderr}")
             return False, elapsed
     except subprocess.TimeoutExpired:
-        print(f"⏰ TIMEOUT: {description} (exceeded {timeout}s)")
+        report.append(f"⏰ TIMEOUT: {description} (exceeded {timeout}s)")
         return False, timeout
     except Exception as e:
-        print(f"❌ ERROR: {description} - {e}")
+        report.append(f"❌ ERROR: {description} - {e}")
         return False, 0
+    finally:
+        print("\n".join(report))
 
 def cleanup_test_files():
     """Clean up test output files"""
     files_to_remove = [
-        'basic_flowchart.docx',
-        'advanced_diagrams.docx',
-        'stress_test.md'
+        'examples/basic_flowchart.docx',
+        'examples/advanced_diagrams.docx',
+        'examples/stress_test.md'
     ]
     
     directories_to_remove = [
@@ -50,20 +72,35 @@ def cleanup_test_files():
     
     print("\n🧹 Cleaning up test files...")
     
+    # Remove directly and treat "not found" as already clean, instead of
+    # stat-ing every path first
     for file in files_to_remove:
-        if os.path.exists(file):
-            os.remove(file)
-            print(f"   Removed: {file}")
-    
+        try:
+            Path(file).unlink()
+        except FileNotFoundError:
+            continue
+        print(f"   Removed: {file}")
+    
+    # Move each directory out of the way (a single rename) and delete its
+    # contents in the background. The thread is non-daemon so the interpreter
+    # still finishes the delete before exiting
     for directory in directories_to_remove:
-        if os.path.exists(directory):
-            import shutil
-            shutil.rmtree(directory)
-            print(f"   Removed: {directory}/")
+        trash = f'{directory}.trash.{os.getpid()}.{time.time_ns()}'
+        try:
+            os.rename(directory, trash)
+        except FileNotFoundError:
+            continue
+        threading.Thread(target=shutil.rmtree, args=(trash,),
+                         kwargs={'ignore_errors': True}).start()
+        print(f"   Removed: {directory}/")
 
 def verify_file_exists(filepath, description):
     """Verify that a file exists and has content"""
-    if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
+    try:
+        size = os.stat(filepath).st_size
+    except OSError:
+        size = 0
+    if size > 0:
         print(f"✅ VERIFIED: {description} - {filepath}")
         return True
     else:
@@ -72,17 +109,19 @@ def verify_file_exists(filepath, description):
 
 def verify_directory_files(directory, expected_count, description):
     """Verify a directory exists and has expected number of files"""
-    if os.path.exists(directory) and os.path.isdir(directory):
-        files = [f for f in os.listdir(directory) if os.path.isfile(os.path.join(directory, f))]
-        if len(files) >= expected_count:
-            print(f"✅ VERIFIED: {description} - {len(files)} files in {directory}/")
-            return True
-        else:
-            print(f"❌ INCOMPLETE: {description} - Expected {expected_count}, found {len(files)} files in {directory}/")
-            return False
-    else:
+    try:
+        # scandir caches each entry's type, so no extra stat per file
+        with os.scandir(directory) as entries:
+            files = [entry.name for entry in entries if entry.is_file()]
+    except (FileNotFoundError, NotADirectoryError):
         print(f"❌ MISSING: {description} - Directory {directory}/ not found")
         return False
+    if len(files) >= expected_count:
+        print(f"✅ VERIFIED: {description} - {len(files)} files in {directory}/")
+        return True
+    else:
+        print(f"❌ INCOMPLETE: {description} - Expected {expected_count}, found {len(files)} files in {directory}/")
+        return False
 
 def main():
     print("🚀 Starting Mermaid Chart Generator Comprehensive Tests")
@@ -94,55 +133,7 @@ def main():
     # Clean up any previous test files
     cleanup_test_files()
     
-    # Test 1: Basic flowchart PNG export
-    test1_success, test1_time = run_test(
-        'python export_flowcharts_only.py examples/basic_flowchart.md',
-        'Basic flowchart PNG export'
-    )
-    test_results.append(('Basic PNG Export', test1_success, test1_time))
-    success &= test1_success
-    
-    # Verify basic test output
-    if test1_success:
-        success &= verify_directory_files('flowchats', 3, 'Basic flowchart PNG files')
-    
-    # Test 2: Advanced diagrams PNG export
-    test2_success, test2_time = run_test(
-        'python export_flowcharts_only.py examples/advanced_diagrams.md',
-        'Advanced diagrams PNG export'
-    )
-    test_results.append(('Advanced PNG Export', test2_success, test2_time))
-    success &= test2_success
-    
-    # Verify advanced test output
-    if test2_success:
-        success &= verify_directory_files('flowchats', 8, 'All PNG files')  # 3 basic + 5 advanced
-    
-    # Test 3: DOCX generation with basic flowcharts
-    test3_success, test3_time = run_test(
-        'python export_document.py examples/basic_flowchart.md',
-        'DOCX document generation (basic)'
-    )
-    test_results.append(('DOCX Basic Export', test3_success, test3_time))
-    success &= test3_success
-    
-    # Verify DOCX file
-    if test3_success:
-        success &= verify_file_exists('basic_flowchart.docx', 'Basic flowchart DOCX file')
-    
-    # Test 4: DOCX generation with advanced diagrams
-    test4_success, test4_time = run_test(
-        'python export_document.py examples/advanced_diagrams.md',
-        'DOCX document generation (advanced)'
-    )
-    test_results.append(('DOCX Advanced Export', test4_success, test4_time))
-    success &= test4_success
-    
-    # Verify DOCX file
-    if test4_success:
-        success &= verify_file_exists('advanced_diagrams.docx', 'Advanced diagrams DOCX file')
-    
-    # Test 5: Create and test with stress test file
+    # Create the stress test file up front so every test can start at once
     print("\n📊 Creating stress test file...")
     stress_content = ""
     for i in range(10):  # Reduced from 50 to 10 for faster testing
@@ -159,17 +150,35 @@ flowchart TD
     with open('examples/stress_test.md', 'w') as f:
         f.write("# Stress Test\\n\\n" + stress_content)
     
-    test5_success, test5_time = run_test(
-        'python export_flowcharts_only.py examples/stress_test.md',
-        'Stress test PNG export (10 diagrams)',
-        timeout=120
-    )
-    test_results.append(('Stress Test Export', test5_success, test5_time))
-    success &= test5_success
+    output_root = tempfile.mkdtemp(prefix='mermaid_tests_')
     
-    # Verify stress test output
-    if test5_success:
-        success &= verify_directory_files('flowchats', 18, 'All PNG files including stress test')  # 3 + 5 + 10
+    def run_case(index, case):
+        name, description, script, input_file, png_count, docx_file, timeout = case
+        output_dir = os.path.join(output_root, f'test_{index}')
+        test_success, test_time = run_test(
+            [sys.executable, script, input_file, '--output-dir', output_dir],
+            description,
+            timeout=timeout
+        )
+        
+        # Verify test output
+        verified = True
+        if test_success and png_count is not None:
+            verified &= verify_directory_files(output_dir, png_count, f'{name} PNG files')
+        if test_success and docx_file is not None:
+            verified &= verify_file_exists(docx_file, f'{name} DOCX file')
+        return name, test_success, test_time, verified
+    
+    wall_start = time.time()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+        futures = [executor.submit(run_case, i, case) for i, case in enumerate(TEST_CASES, 1)]
+        for future in futures:
+            name, test_success, test_time, verified = future.result()
+            test_results.append((name, test_success, test_time))
+            success &= test_success and verified
+    wall_time = time.time() - wall_start
+    
+    shutil.rmtree(output_root, ignore_errors=True)
     
     # Summary
     print("\n" + "="*60)
@@ -182,15 +191,15 @@ flowchart TD
         print(f"{status}: {test_name} ({test_time:.2f}s)")
         total_time += test_time
     
-    print(f"⏱️  Total test time: {total_time:.2f}s")
+    print(f"⏱️  Total test time: {total_time:.2f}s (wall clock: {wall_time:.2f}s)")
     
     if success:
         print("\n🎉 ALL TESTS PASSED!")
         print("The Mermaid Chart Generator is working correctly.")
         print("\n📁 Generated files:")
-        print("- basic_flowchart.docx")
-        print("- advanced_diagrams.docx") 
-        print("- flowchats/ directory with PNG files")
+        print("- examples/basic_flowchart.docx")
+        print("- examples/advanced_diagrams.docx") 
+        print("- PNG files in per-test output directories (removed after verification)")
     else:
         print("\n💥 SOME TESTS FAILED!")
         print("Please check the error messages above.")
@@ -13,7 +13,7 @@ with open('README.md', 'r', encoding='utf-8') as f:
 
 # Read the contents of requirements.txt
 with open('requirements.txt', 'r', encoding='utf-8') as f:
-    requirements = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    requirements = [line for line in map(str.strip, f) if line and line[0] != '#']
 
 setup(
     name="mermaid-chart-generator",
@@ -41,7 +41,6 @@ setup(
         "Intended Audience :: End Users/Desktop",
         "License :: OSI Approved :: MIT License",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
         "Programming Language :: Python :: 3.9",
         "Programming Language :: Python :: 3.10",
@@ -51,7 +50,7 @@ setup(
         "Topic :: Text Processing :: Markup",
         "Topic :: Utilities",
     ],
-    python_requires=">=3.7",
+    python_requires=">=3.8",
     keywords="mermaid, markdown, documentation, diagrams, flowcharts, docx, png",
     project_urls={
         "Source": "https://github.com/jimmywong2003/pyDocumentGeneratorFlowChart",
@@ -6,44 +6,38 @@ Automatically installs all required dependencies for the tool.
 
 import os
 import sys
+import shutil
 import subprocess
-import platform
 import argparse
+import urllib.request
+import concurrent.futures
 from pathlib import Path
 
-class EnvironmentSetup:
-    def __init__(self):
-        self.platform = platform.system().lower()
+from mermaid_common import MermaidExporter
+
+NODESOURCE_SETUP_URL = 'https://deb.nodesource.com/setup_lts.x'
+
+class EnvironmentSetup(MermaidExporter):
+    def __init__(self, skip=()):
+        super().__init__()
+        # Setup steps to leave out: 'python', 'node', 'mermaid', 'pandoc'
+        self.skip = set(skip)
         self.is_windows = self.platform == 'windows'
         self.is_macos = self.platform == 'darwin'
         self.is_linux = self.platform.startswith('linux')
         
-        # Color codes for terminal output
-        self.COLORS = {
-            'RED': '\033[91m',
-            'GREEN': '\033[92m',
-            'YELLOW': '\033[93m',
-            'BLUE': '\033[94m',
-            'MAGENTA': '\033[95m',
-            'CYAN': '\033[96m',
-            'WHITE': '\033[97m',
-            'RESET': '\033[0m',
-            'BOLD': '\033[1m'
-        }
-    
-    def color_print(self, message, color='WHITE', bold=False):
-        """Print colored output to terminal"""
-        color_code = self.COLORS.get(color.upper(), self.COLORS['WHITE'])
-        bold_code = self.COLORS['BOLD'] if bold else ''
-        print(f"{bold_code}{color_code}{message}{self.COLORS['RESET']}")
+        # check_tool_installed results (filled concurrently by probe_tools)
+        self._tool_cache = {}
     
-    def run_command(self, command, description, timeout=120):
-        """Run a command with error handling"""
+    def run_command(self, command, description, timeout=120, input=None):
+        """Run a command (argv list, no shell) with error handling"""
         self.color_print(f"{description}...", 'BLUE')
         try:
+            # Resolve the executable via PATH/PATHEXT so npm.cmd & co. work on Windows
+            executable = shutil.which(command[0]) or command[0]
             result = subprocess.run(
-                command, 
-                shell=True, 
+                [executable] + command[1:], 
+                input=input, 
                 capture_output=True, 
                 text=True, 
                 timeout=timeout
@@ -63,18 +57,37 @@ class EnvironmentSetup:
             self.color_print(f"✗ {description} error: {e}", 'RED')
             return False
     
-    def check_tool_installed(self, tool_name, version_command):
-        """Check if a tool is installed"""
-        try:
-            result = subprocess.run(
-                version_command, 
-                capture_output=True, 
-                text=True, 
-                timeout=10
-            )
-            return result.returncode == 0
-        except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
-            return False
+    def run_commands(self, commands, description, timeout=120):
+        """Try alternative commands in order until one succeeds (like shell '||')"""
+        for command in commands:
+            if self.run_command(command, description, timeout):
+                return True
+        return False
+    
+    def check_tool_installed(self, tool_name, version_command=None):
+        """Check if a tool is installed (probed once per tool)"""
+        if tool_name not in self._tool_cache:
+            if version_command is None:
+                version_command = [tool_name, '--version']
+            try:
+                executable = shutil.which(version_command[0]) or version_command[0]
+                result = subprocess.run(
+                    [executable] + version_command[1:], 
+                    stdout=subprocess.DEVNULL, 
+                    stderr=subprocess.DEVNULL, 
+                    timeout=10
+                )
+                self._tool_cache[tool_name] = result.returncode == 0
+            except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
+                self._tool_cache[tool_name] = False
+        return self._tool_cache[tool_name]
+    
+    def probe_tools(self, tool_names):
+        """Probe several tools' --version concurrently and cache the results"""
+        if not tool_names:
+            return
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(tool_names)) as executor:
+            list(executor.map(self.check_tool_installed, tool_names))
     
     def install_python_dependencies(self):
         """Install Python dependencies from requirements.txt"""
@@ -82,10 +95,49 @@ class EnvironmentSetup:
             self.color_print("requirements.txt not found, creating default...", 'YELLOW')
             self.create_default_requirements()
         
-        return self.run_command(
-            f'"{sys.executable}" -m pip install -r requirements.txt',
-            "Installing Python dependencies"
-        )
+        # Skip pip (and its resolver/index round-trip) when nothing is missing
+        missing = self.find_missing_requirements('requirements.txt')
+        if missing == []:
+            self.color_print("✓ Python dependencies are already installed", 'GREEN')
+            return True
+        if missing is None:
+            command = [sys.executable, '-m', 'pip', 'install', '-r', 'requirements.txt']
+        else:
+            command = [sys.executable, '-m', 'pip', 'install'] + missing
+        
+        return self.run_command(command, "Installing Python dependencies")
+    
+    def find_missing_requirements(self, requirements_file):
+        """Return the requirement lines not satisfied by installed packages,
+        or None when that cannot be determined here"""
+        try:
+            from importlib import metadata
+            from packaging.requirements import Requirement, InvalidRequirement
+        except ImportError:
+            return None
+        
+        with open(requirements_file, encoding='utf-8') as f:
+            lines = [line.split(' #')[0].strip() for line in f]
+        
+        missing = []
+        for line in lines:
+            if not line or line[0] == '#':
+                continue
+            try:
+                req = Requirement(line)
+            except InvalidRequirement:
+                # pip options (-r, -e, --index-url...) need pip itself
+                return None
+            if req.marker is not None and not req.marker.evaluate():
+                continue
+            try:
+                version = metadata.version(req.name)
+            except metadata.PackageNotFoundError:
+                missing.append(line)
+                continue
+            if not req.specifier.contains(version, prereleases=True):
+                missing.append(line)
+        return missing
     
     def create_default_requirements(self):
         """Create default requirements.txt if it doesn't exist"""
@@ -119,19 +171,34 @@ tkinter>=0.0.0  # Usually included with Python
         self.color_print("Node.js installation required...", 'YELLOW')
         
         if self.is_windows:
-            return self.run_command(
-                "winget install OpenJS.NodeJS || choco install nodejs -y",
+            return self.run_commands(
+                [['winget', 'install', 'OpenJS.NodeJS'], ['choco', 'install', 'nodejs', '-y']],
                 "Installing Node.js via Winget/Chocolatey"
             )
         elif self.is_macos:
             return self.run_command(
-                "brew install node",
+                ['brew', 'install', 'node'],
                 "Installing Node.js via Homebrew"
             )
         elif self.is_linux:
-            return self.run_command(
-                "curl -fsSL https://deb.nodesource.com/setup_lts.x | sudo -E bash - && sudo apt-get install -y nodejs",
-                "Installing Node.js via NodeSource"
+            # Fetch the NodeSource setup script ourselves and feed it to bash,
+            # instead of a shell 'curl | bash && apt-get' pipeline
+            try:
+                with urllib.request.urlopen(NODESOURCE_SETUP_URL, timeout=60) as response:
+                    setup_script = response.read().decode('utf-8')
+            except Exception as e:
+                self.color_print(f"✗ Failed to download NodeSource setup script: {e}", 'RED')
+                return False
+            return (
+                self.run_command(
+                    ['sudo', '-E', 'bash', '-'],
+                    "Configuring NodeSource repository",
+                    input=setup_script
+                )
+                and self.run_command(
+                    ['sudo', 'apt-get', 'install', '-y', 'nodejs'],
+                    "Installing Node.js via NodeSource"
+                )
             )
         else:
             self.color_print("Please install Node.js manually from https://nodejs.org/", 'YELLOW')
@@ -140,21 +207,12 @@ tkinter>=0.0.0  # Usually included with Python
     def install_mermaid_cli(self):
         """Install Mermaid CLI"""
         # Check if mmdc is already installed
-        try:
-            result = subprocess.run(
-                ['mmdc', '--version'],
-                capture_output=True, 
-                text=True, 
-                timeout=10
-            )
-            if result.returncode == 0:
-                self.color_print("✓ Mermaid CLI is already installed", 'GREEN')
-                return True
-        except:
-            pass
+        if self.check_tool_installed('mmdc'):
+            self.color_print("✓ Mermaid CLI is already installed", 'GREEN')
+            return True
         
         return self.run_command(
-            "npm install -g @mermaid-js/mermaid-cli",
+            ['npm', 'install', '-g', '@mermaid-js/mermaid-cli'],
             "Installing Mermaid CLI"
         )
     
@@ -169,18 +227,18 @@ tkinter>=0.0.0  # Usually included with Python
         self.color_print("Pandoc installation required...", 'YELLOW')
         
         if self.is_windows:
-            return self.run_command(
-                "winget install JohnMacFarlane.Pandoc || choco install pandoc -y",
+            return self.run_commands(
+                [['winget', 'install', 'JohnMacFarlane.Pandoc'], ['choco', 'install', 'pandoc', '-y']],
                 "Installing Pandoc via Winget/Chocolatey"
             )
         elif self.is_macos:
             return self.run_command(
-                "brew install pandoc",
+                ['brew', 'install', 'pandoc'],
                 "Installing Pandoc via Homebrew"
             )
         elif self.is_linux:
-            return self.run_command(
-                "sudo apt-get install -y pandoc || sudo dnf install -y pandoc",
+            return self.run_commands(
+                [['sudo', 'apt-get', 'install', '-y', 'pandoc'], ['sudo', 'dnf', 'install', '-y', 'pandoc']],
                 "Installing Pandoc via package manager"
             )
         else:
@@ -195,17 +253,21 @@ tkinter>=0.0.0  # Usually included with Python
         
         success = True
         
-        # Install Python dependencies
-        success &= self.install_python_dependencies()
+        # (step name, install method, tools it checks for)
+        steps = [
+            ('python', self.install_python_dependencies, []),
+            ('node', self.install_nodejs, ['node', 'npm']),
+            ('mermaid', self.install_mermaid_cli, ['mmdc']),
+            ('pandoc', self.install_pandoc, ['pandoc']),
+        ]
+        steps = [step for step in steps if step[0] not in self.skip]
         
-        # Install Node.js and npm
-        success &= self.install_nodejs()
+        # Detect the external tools the remaining steps need in one parallel batch
+        self.probe_tools([tool for _, _, tools in steps for tool in tools])
         
-        # Install Mermaid CLI
-        success &= self.install_mermaid_cli()
-        
-        # Install Pandoc
-        success &= self.install_pandoc()
+        # Install Python dependencies, Node.js and npm, Mermaid CLI and Pandoc
+        for _, install, _ in steps:
+            success &= install()
         
         # Summary
         self.color_print("\n" + "=" * 60, 'CYAN')
@@ -229,17 +291,10 @@ def main():
     
     args = parser.parse_args()
     
-    setup = EnvironmentSetup()
-    
-    # Override methods based on skip flags
-    if args.skip_python:
-        setup.install_python_dependencies = lambda: True
-    if args.skip_node:
-        setup.install_nodejs = lambda: True
-    if args.skip_mermaid:
-        setup.install_mermaid_cli = lambda: True
-    if args.skip_pandoc:
-        setup.install_pandoc = lambda: True
+    # Leave out the steps named by the skip flags
+    skip = [step for step in ('python', 'node', 'mermaid', 'pandoc')
+            if getattr(args, f'skip_{step}')]
+    setup = EnvironmentSetup(skip)
     
     success = setup.setup_environment()
     sys.exit(0 if success else 1)
@@ -7,92 +7,486 @@ Creates and configures a Python virtual environment for the project.
 import os
 import sys
 import subprocess
-import platform
 import venv
+import shutil
+import zipfile
+import hashlib
+import sysconfig
+import tempfile
+import ensurepip
+import concurrent.futures
+import threading
 from pathlib import Path
 
+from mermaid_common import run_streaming
+
+# Per-user cache for unpacked pip wheels and downloaded requirement wheels
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "pyDocGenFC"
+
+# File in the project that records where its (out-of-tree) venv lives
+VENV_POINTER = ".venv-path"
+
+# Wheelhouse filled by 'pip download' so reinstalls skip PyPI; shared by all
+# projects and interpreters (pip only picks wheels matching the venv)
+WHEELHOUSE = CACHE_DIR / "wheels"
+
+# pip's own per-connection timeout and retry count, so a stuck download is
+# retried long before the overall install timeout kills pip
+PIP_NETWORK_OPTIONS = ["--timeout", "60", "--retries", "5"]
+
+# Lines of pip's output shown when an install times out
+TIMEOUT_LOG_LINES = 10
+
+# subprocess only takes its posix_spawn (vfork+exec) fast path when close_fds
+# is False. Descriptors Python opens are non-inheritable anyway (PEP 446), so
+# nothing extra leaks into pip
+SPAWN_OPTIONS = {"close_fds": False}
+
+# Console script written for pip when it is seeded from the cache
+PIP_SCRIPT = """#!{python}
+# -*- coding: utf-8 -*-
+import sys
+from pip._internal.cli.main import main
+if __name__ == "__main__":
+    sys.exit(main())
+"""
+
+# Linux ioctl that makes dst a copy-on-write clone of src (Btrfs, XFS, ...)
+FICLONE = 0x40049409
+
+def _fast_copy(src, dst):
+    """Copy one file: reflink clone if the filesystem supports it, else an
+    in-kernel copy_file_range, else shutil.copy2"""
+    try:
+        import fcntl
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            try:
+                fcntl.ioctl(fdst.fileno(), getattr(fcntl, "FICLONE", FICLONE), fsrc.fileno())
+            except OSError:
+                if not hasattr(os, "copy_file_range"):
+                    raise
+                # Bytes stay in the kernel; loop as it may copy less per call
+                while os.copy_file_range(fsrc.fileno(), fdst.fileno(), 1 << 30):
+                    pass
+        shutil.copystat(src, dst)
+        return dst
+    except (ImportError, OSError):
+        return shutil.copy2(src, dst)
+        
+def _fast_copytree(src, dst):
+    """Copy a directory tree into dst (merging), cloning where possible"""
+    if sys.platform == "darwin":
+        # cp -c clones files on APFS
+        try:
+            os.makedirs(dst, exist_ok=True)
+            subprocess.run(["cp", "-cR", f"{src}/.", str(dst)], check=True,
+                           capture_output=True, **SPAWN_OPTIONS)
+            return dst
+        except (subprocess.SubprocessError, OSError):
+            pass
+    return shutil.copytree(src, dst, copy_function=_fast_copy, dirs_exist_ok=True)
+
 class VenvSetup:
     def __init__(self):
-        self.platform = platform.system().lower()
-        self.venv_dir = "venv"
+        # sys.platform is fixed at interpreter build time; no platform probing
+        self._is_windows = sys.platform.startswith("win")
+        # The venv lives outside the project (one per checkout) so nothing
+        # large is written into the tree; PYDGFC_VENV overrides the location
+        project_id = hashlib.sha256(str(Path.cwd()).encode()).hexdigest()[:12]
+        self.venv_dir = os.environ.get("PYDGFC_VENV") or str(CACHE_DIR / "venv" / project_id)
         self.venv_path = Path(self.venv_dir)
         
+        # Venv locations never change during a run, so resolve them once
+        self._bin = self.venv_path / ("Scripts" if self._is_windows else "bin")
+        self._py = self._bin / ("python.exe" if self._is_windows else "python")
+        self._pip = self._bin / ("pip.exe" if self._is_windows else "pip")
+        self._activate_hint = "activate.bat" if self._is_windows else "source activate.sh"
+        
+        # Faster venv/installer tools, used instead of the stdlib when present
+        self._uv = shutil.which("uv")
+        self._virtualenv = shutil.which("virtualenv")
+        
+        # Whether requirements.txt exists, looked up once (None = not yet)
+        self._req_present = None
+        
+        # Setup steps run concurrently; keep their messages whole
+        self._print_lock = threading.Lock()
+        
+    def log(self, message):
+        """Print a message without interleaving it with other steps' output"""
+        with self._print_lock:
+            print(message)
+        
     def create_venv(self):
         """Create Python virtual environment"""
-        print("Creating Python virtual environment...")
+        self.log("Creating Python virtual environment...")
         
         if self.venv_path.exists():
-            print(f"Virtual environment already exists at {self.venv_path}")
+            self.log(f"Virtual environment already exists at {self.venv_path}")
+            return True
+            
+        if self._create_with_external_tool():
+            self.log(f"✓ Virtual environment created at {self.venv_path}")
             return True
             
         try:
-            # Create virtual environment
-            venv.create(self.venv_dir, with_pip=True)
-            print(f"✓ Virtual environment created at {self.venv_path}")
+            # Create the environment without ensurepip, then copy in pip from
+            # the unpacked wheel cache; ensurepip is only the fallback.
+            # Symlink the interpreter rather than copying it, except on Windows
+            venv.EnvBuilder(with_pip=False, symlinks=not self._is_windows).create(self.venv_dir)
+            if not self._seed_pip_from_cache():
+                subprocess.run(
+                    [str(self.get_venv_python()), "-Im", "ensurepip", "--upgrade", "--default-pip"],
+                    check=True,
+                    capture_output=True,
+                    timeout=300,
+                    **SPAWN_OPTIONS
+                )
+            self.log(f"✓ Virtual environment created at {self.venv_path}")
             return True
         except Exception as e:
-            print(f"✗ Failed to create virtual environment: {e}")
+            self.log(f"✗ Failed to create virtual environment: {e}")
+            return False
+            
+    def _create_with_external_tool(self):
+        """Create the venv with uv or virtualenv if installed; True on success"""
+        if self._uv:
+            # --seed: the venv still gets its own pip
+            command = [self._uv, "venv", "--seed", "--python", sys.executable, self.venv_dir]
+            timeout = 60
+        elif self._virtualenv:
+            command = [self._virtualenv, "--python", sys.executable, self.venv_dir]
+            timeout = 120
+        else:
+            return False
+            
+        try:
+            subprocess.run(command, check=True, capture_output=True, timeout=timeout, **SPAWN_OPTIONS)
+            return True
+        except (subprocess.SubprocessError, OSError) as e:
+            self.log(f"ℹ {Path(command[0]).name} failed ({e}), using the standard venv module")
+            shutil.rmtree(self.venv_path, ignore_errors=True)
+            return False
+            
+    def _req_hash(self):
+        """Hash identifying an installed venv: requirements.txt plus the
+        interpreter it was installed for (None if no requirements)"""
+        try:
+            digest = hashlib.sha256(Path("requirements.txt").read_bytes())
+        except FileNotFoundError:
+            return None
+        digest.update(sys.version.encode())
+        return digest.hexdigest()
+        
+    def _ensure_pip_wheel_cache(self):
+        """Unpack the pip wheel bundled with ensurepip into the cache (once)
+        and return the unpacked tree, or None if no wheel is available"""
+        image = CACHE_DIR / "image" / f"pip-{ensurepip.version()}"
+        if image.is_dir():
+            return image
+            
+        bundled = Path(ensurepip.__file__).parent / "_bundled"
+        wheels = sorted(bundled.glob("pip-*.whl"))
+        if not wheels:
+            return None
+            
+        # Unpack next to the final location and rename, so a half-written
+        # tree is never picked up by a concurrent or interrupted run
+        image.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=image.parent))
+        try:
+            with zipfile.ZipFile(wheels[-1]) as wheel:
+                wheel.extractall(staging)
+            staging.rename(image)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            if not image.is_dir():
+                raise
+        return image
+        
+    def _seed_pip_from_cache(self):
+        """Copy the cached pip tree into the venv; False means use ensurepip"""
+        # pip.exe is a compiled launcher that only pip itself can produce
+        if self._is_windows:
+            return False
+        try:
+            image = self._ensure_pip_wheel_cache()
+            if image is None:
+                return False
+            version = f"python{sys.version_info[0]}.{sys.version_info[1]}"
+            site_packages = self.venv_path / "lib" / version / "site-packages"
+            _fast_copytree(image, site_packages)
+            
+            script = PIP_SCRIPT.format(python=self.get_venv_python().absolute())
+            for name in ("pip", "pip3", f"pip{sys.version_info[0]}.{sys.version_info[1]}"):
+                path = self._bin / name
+                path.write_text(script)
+                path.chmod(0o755)
+            return True
+        except (OSError, zipfile.BadZipFile) as e:
+            self.log(f"ℹ pip cache unavailable ({e}), falling back to ensurepip")
             return False
             
     def get_venv_python(self):
         """Get path to virtual environment Python executable"""
-        if self.platform == "windows":
-            return self.venv_path / "Scripts" / "python.exe"
-        else:
-            return self.venv_path / "bin" / "python"
+        return self._py
             
     def get_venv_pip(self):
         """Get path to virtual environment pip executable"""
-        if self.platform == "windows":
-            return self.venv_path / "Scripts" / "pip.exe"
-        else:
-            return self.venv_path / "bin" / "pip"
+        return self._pip
             
-    def install_dependencies(self):
-        """Install Python dependencies in virtual environment"""
+    def install_dependencies(self, timeout=600):
+        """Install Python dependencies in virtual environment (each pip run is
+        limited to timeout seconds, or $PYDGFC_PIP_TIMEOUT)"""
+        timeout = self._pip_timeout(timeout)
         pip_path = self.get_venv_pip()
         
-        if not pip_path.exists():
-            print("✗ pip not found in virtual environment")
+        # One directory read instead of a stat per executable
+        try:
+            with os.scandir(self._bin) as entries:
+                bin_names = {entry.name for entry in entries}
+        except FileNotFoundError:
+            bin_names = set()
+        if pip_path.name not in bin_names:
+            self.log("✗ pip not found in virtual environment")
             return False
             
-        print("Installing Python dependencies...")
+        self.log("Installing Python dependencies...")
         
         try:
             # Install requirements.txt if it exists
-            if Path("requirements.txt").exists():
-                result = subprocess.run(
-                    [str(pip_path), "install", "-r", "requirements.txt"],
-                    capture_output=True,
-                    text=True,
-                    timeout=300
-                )
-                
-                if result.returncode == 0:
-                    print("✓ Python dependencies installed successfully")
-                    return True
+            if self._has_requirements():
+                # .venvhash records the requirements this venv was installed from
+                req_hash = self._req_hash()
+                sentinel = self.venv_path / ".venvhash"
+                try:
+                    if sentinel.read_text() == req_hash:
+                        self.log("✓ Python dependencies already installed (requirements.txt unchanged)")
+                        return True
+                except FileNotFoundError:
+                    pass
+                    
+                # Prefer prebuilt wheels and skip bytecode compilation; install
+                # from the local wheelhouse (no index lookups) once it holds
+                # these requirements
+                requirements = self._parse_requirements("requirements.txt")
+                index_args = [str(pip_path), "install", "--no-compile", "--prefer-binary"] + PIP_NETWORK_OPTIONS
+                offline = False
+                if self._uv:
+                    # uv resolves and downloads in parallel with its own cache
+                    install_args = [self._uv, "pip", "install", "--python", str(self._py)]
+                elif self._prepare_wheelhouse(requirements, timeout):
+                    offline = True
+                    install_args = index_args + ["--no-index", "--find-links", str(WHEELHOUSE)]
                 else:
-                    print(f"✗ Failed to install dependencies: {result.stderr}")
-                    return False
+                    install_args = index_args
+                    
+                installed = self._run_install(install_args + ["-r", "requirements.txt"], timeout)
+                if not installed and offline:
+                    # The wheelhouse is missing something after all: forget it
+                    # for these requirements and go through the index
+                    self.log("ℹ Install from the wheelhouse failed, retrying from the package index")
+                    try:
+                        self._wheelhouse_sentinel().unlink()
+                    except FileNotFoundError:
+                        pass
+                    installed = self._run_install(index_args + ["-r", "requirements.txt"], timeout)
+                    
+                if installed:
+                    self.log("✓ Python dependencies installed successfully")
+                    # pip ran with --no-compile; compile everything once, in parallel
+                    self._compile_venv(timeout)
+                    sentinel.write_text(req_hash)
+                return installed
             else:
-                print("ℹ No requirements.txt found, skipping Python dependency installation")
+                self.log("ℹ No requirements.txt found, skipping Python dependency installation")
                 return True
                 
         except subprocess.TimeoutExpired:
-            print("✗ Dependency installation timed out")
+            self.log("✗ Dependency installation timed out")
             return False
         except Exception as e:
-            print(f"✗ Error during dependency installation: {e}")
+            self.log(f"✗ Error during dependency installation: {e}")
+            return False
+            
+    def _pip_timeout(self, default):
+        """Per-run pip timeout: $PYDGFC_PIP_TIMEOUT if it is a positive whole
+        number of seconds, otherwise the default"""
+        value = os.environ.get("PYDGFC_PIP_TIMEOUT", "").strip()
+        if not value:
+            return default
+        try:
+            timeout = int(value)
+        except ValueError:
+            timeout = 0
+        if timeout <= 0:
+            self.log(f"ℹ Ignoring PYDGFC_PIP_TIMEOUT={value!r} (expected a positive number of seconds), using {default}s")
+            return default
+        return timeout
+        
+    def _run_install(self, command, timeout):
+        """Run a pip install: output shown live, or file-backed in CI logs"""
+        if os.environ.get("CI"):
+            return self._run_logged(command, timeout)
+        return self._run_streaming(command, timeout)
+        
+    def _run_streaming(self, command, timeout):
+        """Run pip, echoing its combined output line by line; True on success"""
+        try:
+            return_code = run_streaming(
+                command,
+                timeout,
+                lambda line: self.log(line.rstrip("\n")),
+                bufsize=1,
+                # pip is a Python program: unbuffered, so lines arrive as printed
+                env=dict(os.environ, PYTHONUNBUFFERED="1"),
+                **SPAWN_OPTIONS
+            )
+        except subprocess.TimeoutExpired:
+            self.log(f"✗ Dependency installation timed out after {timeout}s")
+            return False
+        if return_code != 0:
+            self.log("✗ Failed to install dependencies (see pip output above)")
+            return False
+        return True
+        
+    def _run_logged(self, command, timeout):
+        """Run pip with its output in temporary files, shown only on failure;
+        True on success"""
+        with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+            try:
+                result = subprocess.run(
+                    command,
+                    stdout=out,
+                    stderr=err,
+                    timeout=timeout,
+                    # Unbuffered, so the log is complete up to a kill
+                    env=dict(os.environ, PYTHONUNBUFFERED="1"),
+                    **SPAWN_OPTIONS
+                )
+            except subprocess.TimeoutExpired:
+                # Show where pip got stuck
+                out.seek(0)
+                lines = out.read().decode(errors="replace").splitlines()
+                self.log(f"✗ Dependency installation timed out after {timeout}s; last output:")
+                self.log("\n".join(lines[-TIMEOUT_LOG_LINES:]))
+                return False
+                
+            if result.returncode != 0:
+                err.seek(0)
+                error_output = err.read().decode(errors="replace")
+                self.log(f"✗ Failed to install dependencies: {error_output}")
+                return False
+            return True
+            
+    def _compile_venv(self, timeout):
+        """Byte-compile the venv on all cores; with PYDGFC_STRIP_SOURCE=1 the
+        .pyc files go next to the sources and the compiled sources are removed"""
+        self.log("Byte-compiling installed packages...")
+        strip_source = os.environ.get("PYDGFC_STRIP_SOURCE") == "1"
+        command = [str(self._py), "-m", "compileall", "-q", "-j", str(os.cpu_count() or 4)]
+        if strip_source:
+            # Legacy layout: a .pyc beside its .py still imports once the .py is gone
+            command.append("-b")
+        command.append(str(self.venv_path))
+        
+        try:
+            result = subprocess.run(
+                command,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=timeout,
+                **SPAWN_OPTIONS
+            )
+        except subprocess.TimeoutExpired:
+            self.log("ℹ Byte-compiling timed out; modules will compile on first import")
+            return
+        if result.returncode != 0:
+            # Usually test files with syntax for other Python versions
+            self.log("ℹ Some files could not be byte-compiled")
+            
+        if strip_source:
+            # Only drop sources that actually have a compiled twin
+            for source in self.venv_path.rglob("*.py"):
+                if source.with_suffix(".pyc").is_file():
+                    source.unlink()
+                    
+    def _parse_requirements(self, path):
+        """Return the requirement lines of a requirements file"""
+        with open(path, encoding="utf-8") as f:
+            lines = [line.split(" #")[0].strip() for line in f]
+        # pip options (-r, -e, --index-url...) only make sense for the full pass
+        return [line for line in lines if line and line[0] not in "#-"]
+        
+    def _download_per_requirement(self, download_args, requirements, timeout):
+        """Download each requirement (without dependencies) into the wheelhouse,
+        several at a time; every pip gets its own directory so they never share
+        files, and the results are moved over once all have finished"""
+        if not requirements:
+            return
+        WHEELHOUSE.mkdir(parents=True, exist_ok=True)
+        workers = min(os.cpu_count() or 4, len(requirements), 8)
+        with tempfile.TemporaryDirectory(dir=WHEELHOUSE) as staging:
+            destinations = [Path(staging) / str(index) for index in range(len(requirements))]
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(
+                    lambda job: self._run_pip_quietly(
+                        download_args + ["--no-deps", "-d", str(job[0]), job[1]], timeout),
+                    zip(destinations, requirements)
+                ))
+            for destination in destinations:
+                if destination.is_dir():
+                    for wheel in destination.iterdir():
+                        os.replace(wheel, WHEELHOUSE / wheel.name)
+                        
+    def _run_pip_quietly(self, command, timeout):
+        """Run a pip command, discarding its output; True on success"""
+        try:
+            result = subprocess.run(
+                command,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=timeout,
+                **SPAWN_OPTIONS
+            )
+            return result.returncode == 0
+        except subprocess.TimeoutExpired:
             return False
             
+    def _prepare_wheelhouse(self, requirements, timeout):
+        """Make sure the wheelhouse holds wheels for the current requirements
+        (downloading them once); True if it can be installed from offline"""
+        sentinel = self._wheelhouse_sentinel()
+        if sentinel.is_file():
+            return True
+            
+        self.log("Downloading wheels into the local wheelhouse...")
+        # The listed packages concurrently, then one resolving pass for the rest
+        download_args = [str(self.get_venv_pip()), "download", "--prefer-binary"] + PIP_NETWORK_OPTIONS
+        self._download_per_requirement(download_args, requirements, timeout)
+        if not self._run_pip_quietly(download_args + ["-d", str(WHEELHOUSE), "-r", "requirements.txt"], timeout):
+            self.log("ℹ Wheelhouse download failed, installing from the package index")
+            return False
+        sentinel.touch()
+        return True
+        
+    def _wheelhouse_sentinel(self):
+        """Marker showing the wheelhouse holds wheels for these requirements on
+        this interpreter and platform (wheels are ABI specific)"""
+        digest = hashlib.sha256(Path("requirements.txt").read_bytes())
+        digest.update(sys.version.encode())
+        digest.update(sysconfig.get_platform().encode())
+        return WHEELHOUSE / f".complete-{digest.hexdigest()}"
+        
     def create_activation_scripts(self):
         """Create activation scripts for convenience"""
-        print("Creating activation scripts...")
+        self.log("Creating activation scripts...")
         
         # Create activate.bat for Windows
         activate_bat = """@echo off
 echo Activating virtual environment...
-call venv\\Scripts\\activate.bat
+set /p VENV_DIR=<.venv-path
+call "%VENV_DIR%\\Scripts\\activate.bat"
 echo Virtual environment activated!
 echo.
 echo To deactivate, run: deactivate
@@ -101,32 +495,67 @@ echo To deactivate, run: deactivate
         # Create activate.sh for Unix-like systems
         activate_sh = """#!/bin/bash
 echo "Activating virtual environment..."
-source venv/bin/activate
+source "$(cat .venv-path)/bin/activate"
 echo "Virtual environment activated!"
 echo ""
 echo "To deactivate, run: deactivate"
 """
         
         try:
-            with open("activate.bat", "w") as f:
-                f.write(activate_bat)
-            print("✓ Created activate.bat for Windows")
+            # Both scripts find the venv through the pointer file
+            self._write_if_changed(VENV_POINTER, self.venv_dir)
+            
+            self._write_if_changed("activate.bat", activate_bat)
+            self.log("✓ Created activate.bat for Windows")
             
-            with open("activate.sh", "w") as f:
-                f.write(activate_sh)
             # Make shell script executable
-            os.chmod("activate.sh", 0o755)
-            print("✓ Created activate.sh for Unix systems")
+            self._write_if_changed("activate.sh", activate_sh, mode=0o755)
+            self.log("✓ Created activate.sh for Unix systems")
             
             return True
         except Exception as e:
-            print(f"✗ Failed to create activation scripts: {e}")
+            self.log(f"✗ Failed to create activation scripts: {e}")
             return False
             
+    def _write_if_changed(self, path, content, mode=None):
+        """Write a text file only if its content differs, so unchanged files
+        keep their mtime; optionally make sure it has the given mode"""
+        # Same bytes as a text-mode write (native line endings)
+        data = content.replace("\n", os.linesep).encode()
+        path = Path(path)
+        try:
+            unchanged = path.read_bytes() == data
+        except FileNotFoundError:
+            unchanged = False
+        if unchanged:
+            if mode is not None and os.stat(path).st_mode & 0o777 != mode:
+                os.chmod(path, mode)
+        elif mode is None:
+            path.write_bytes(data)
+        else:
+            # Unbuffered write, with the mode set on the open descriptor
+            # (creation mode is reduced by the umask; existing files keep theirs)
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+            try:
+                while data:
+                    data = data[os.write(fd, data):]
+                # No fchmod (or executable bit) on Windows
+                if hasattr(os, "fchmod"):
+                    os.fchmod(fd, mode)
+            finally:
+                os.close(fd)
+        return True
+        
+    def _has_requirements(self):
+        """Whether requirements.txt exists (checked once per run)"""
+        if self._req_present is None:
+            self._req_present = Path("requirements.txt").is_file()
+        return self._req_present
+        
     def create_venv_requirements(self):
         """Create basic requirements if none exists"""
-        if not Path("requirements.txt").exists():
-            print("Creating basic requirements.txt...")
+        if not self._has_requirements():
+            self.log("Creating basic requirements.txt...")
             
             requirements = """# Mermaid Chart Generator - Python Dependencies
 # Core dependencies for the project
@@ -147,51 +576,50 @@ echo "To deactivate, run: deactivate"
 """
             
             try:
-                with open("requirements.txt", "w") as f:
-                    f.write(requirements)
-                print("✓ Created requirements.txt")
+                self._write_if_changed("requirements.txt", requirements)
+                self._req_present = True
+                self.log("✓ Created requirements.txt")
                 return True
             except Exception as e:
-                print(f"✗ Failed to create requirements.txt: {e}")
+                self.log(f"✗ Failed to create requirements.txt: {e}")
                 return False
         return True
         
     def setup_environment(self):
         """Main setup method"""
-        print("=" * 60)
-        print("VIRTUAL ENVIRONMENT SETUP")
-        print("=" * 60)
+        self.log("=" * 60)
+        self.log("VIRTUAL ENVIRONMENT SETUP")
+        self.log("=" * 60)
         
         success = True
         
         # Create virtual environment
         success &= self.create_venv()
         
-        # Create requirements if needed
-        success &= self.create_venv_requirements()
-        
-        # Install dependencies
-        success &= self.install_dependencies()
-        
-        # Create activation scripts
-        success &= self.create_activation_scripts()
+        # The activation scripts don't depend on the other steps, so they are
+        # written while requirements are prepared and installed
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            activation = executor.submit(self.create_activation_scripts)
+            
+            # Create requirements if needed, then install dependencies
+            success &= self.create_venv_requirements()
+            success &= self.install_dependencies()
+            
+            success &= activation.result()
         
         # Summary
-        print("\n" + "=" * 60)
+        self.log("\n" + "=" * 60)
         if success:
-            print("✓ Virtual environment setup completed successfully!")
-            print("\nNext steps:")
-            print("1. Activate the virtual environment:")
-            if self.platform == "windows":
-                print("   activate.bat")
-            else:
-                print("   source activate.sh")
-            print("2. Run the setup script to install other dependencies:")
-            print("   python setup_env.py")
-            print("3. Use the tool:")
-            print("   python gui_tool.py")
+            self.log("✓ Virtual environment setup completed successfully!")
+            self.log("\nNext steps:")
+            self.log("1. Activate the virtual environment:")
+            self.log(f"   {self._activate_hint}")
+            self.log("2. Run the setup script to install other dependencies:")
+            self.log("   python setup_env.py")
+            self.log("3. Use the tool:")
+            self.log("   python gui_tool.py")
         else:
-            print("✗ Virtual environment setup completed with errors")
+            self.log("✗ Virtual environment setup completed with errors")
             
         return success
 